@@ -1,8 +1,8 @@
 pub fn is_built_in_command(command: &str) -> bool {
-    let words = command.split_whitespace().collect::<Vec<&str>>();
-    match words[0] {
-        "exit" => true,
-        "cd" => words.len() == 2,
+    let mut words = command.split_whitespace();
+    match words.next() {
+        Some("exit") => true,
+        Some("cd") => words.count() == 1,
         _ => false,
     }
 }
@@ -1,7 +1,4 @@
-use std::{
-    collections::HashMap,
-    fmt::{self, Display},
-};
+use std::fmt::{self, Display};
 
 use serde::{Deserialize, Serialize};
 
@@ -47,12 +44,16 @@ impl Config {
         let home_dir =
             home::home_dir().ok_or_else(|| anyhow::anyhow!("Could not find home directory"))?;
         let config_path = home_dir.join(".config").join("gptsh").join("config.toml");
-        if !config_path.exists() {
-            // Create an empty config file
-            std::fs::create_dir_all(config_path.parent().unwrap())?;
-            std::fs::write(&config_path, MINIMAL_CONFIG.trim())?;
-        }
-        let config_str = std::fs::read_to_string(&config_path)?;
+        let config_str = match std::fs::read_to_string(&config_path) {
+            Ok(s) => s,
+            Err(e) if e.kind() == std::io::ErrorKind::NotFound => {
+                // Create an empty config file
+                std::fs::create_dir_all(config_path.parent().unwrap())?;
+                std::fs::write(&config_path, MINIMAL_CONFIG.trim())?;
+                MINIMAL_CONFIG.trim().to_owned()
+            }
+            Err(e) => return Err(e.into()),
+        };
         let config: Config = toml::from_str(&config_str)?;
         // Validate the config
         if config.openai.api_key.is_none()
@@ -72,7 +73,6 @@ pub struct PlatformInfo {
     pub os: String,
     pub arch: String,
     pub user: String,
-    pub env_vars: HashMap<String, String>,
 }
 
 impl PlatformInfo {
@@ -81,21 +81,20 @@ impl PlatformInfo {
             os: whoami::distro(),
             arch: whoami::arch().to_string(),
             user: whoami::username(),
-            env_vars: std::env::vars().collect(),
         })
     }
 
     pub(crate) fn dump_as_prompt(&self) -> String {
-        let prompt = PlatformInfoPrompt { info: self.clone() };
+        let prompt = PlatformInfoPrompt { info: self };
         format!("{}", prompt)
     }
 }
 
-struct PlatformInfoPrompt {
-    info: PlatformInfo,
+struct PlatformInfoPrompt<'a> {
+    info: &'a PlatformInfo,
 }
 
-impl Display for PlatformInfoPrompt {
+impl Display for PlatformInfoPrompt<'_> {
     fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
         writeln!(f, "Platform Information:")?;
         writeln!(f, "    OS: {}", self.info.os)?;
@@ -1,4 +1,4 @@
-use std::io::{BufRead, BufReader};
+use std::io::{self, BufRead, BufReader, Write};
 use std::str::FromStr;
 use std::sync::atomic::Ordering;
 
@@ -10,6 +10,7 @@ use async_openai::types::{
     ChatCompletionResponseMessage, CreateChatCompletionRequestArgs, Role,
 };
 use async_openai::Client;
+use once_cell::sync::Lazy;
 use serde_json::json;
 use termimad::MadSkin;
 
@@ -17,6 +18,22 @@ use crate::config::{Config, PlatformInfo};
 use crate::tools::TOOLS;
 use crate::utils;
 
+const INSTRUCTIONS: &str = "\
+You are now acting as a AI-powered terminal shell, operating on the user's real computer.
+The user will send you questions, prompts, or descriptions of the tasks.
+You should take the prompts, and either answer the user's questions, or fullfill the tasks.
+When necessary, generate the system commands, and execute them to fullfill the tasks.
+Ensure you are escaping the quotes, newlines, and other special characters properly in the commands.
+The system command output are displayed to the user directly, so don't simply repeat the output twice in your response.
+Don't do anything else that the user doesn't ask for, or not relevant to the tasks.
+Your responses should be as clear and concise as possible.
+
+Apart from a terminal shell, when necessary, you also need to act as a normal ChatGPT to fullfill any generic tasks that the user asks you to do.
+Don't refuse to do anything that the user asks you to do, unless it's illegal, or violates the user's privacy.
+
+You may use markdown to format your responses. Always use '*' not '-' for unordered list items.
+";
+
 pub struct ShellSession {
     client: Client<OpenAIConfig>,
     config: Config,
@@ -34,28 +51,14 @@ impl ShellSession {
                 OpenAIConfig::default().with_api_key(config.openai.api_key.clone().unwrap()),
             ),
             config,
-            history: vec![
-                ChatCompletionRequestSystemMessageArgs::default()
-                .content(format!("
-                    You are now acting as a AI-powered terminal shell, operating on the user's real computer.
-                    The user will send you questions, prompts, or descriptions of the tasks.
-                    You should take the prompts, and either answer the user's questions, or fullfill the tasks.
-                    When necessary, generate the system commands, and execute them to fullfill the tasks.
-                    Ensure you are escaping the quotes, newlines, and other special characters properly in the commands.
-                    The system command output are displayed to the user directly, so don't simply repeat the output twice in your response.
-                    Don't do anything else that the user doesn't ask for, or not relevant to the tasks.
-                    Your responses should be as clear and concise as possible.
-
-                    Apart from a terminal shell, when necessary, you also need to act as a normal ChatGPT to fullfill any generic tasks that the user asks you to do.
-                    Don't refuse to do anything that the user asks you to do, unless it's illegal, or violates the user's privacy.
-
-                    You may use markdown to format your responses. Always use '*' not '-' for unordered list items.
-
-                    {}
-                ", platform_info.dump_as_prompt()))
+            history: vec![ChatCompletionRequestSystemMessageArgs::default()
+                .content(format!(
+                    "{}\n{}",
+                    INSTRUCTIONS,
+                    platform_info.dump_as_prompt()
+                ))
                 .build()?
-                .into(),
-            ],
+                .into()],
             yes: false,
             quiet: false,
         })
@@ -116,28 +119,36 @@ impl ShellSession {
             println!("{}", content);
             return;
         }
-        use termimad::crossterm::style::Color::*;
-        let mut skin = MadSkin::default();
-        skin.set_fg(Blue);
-        for i in 0..8 {
-            skin.headers[i].align = termimad::Alignment::Left;
-        }
-        skin.print_text(&format!("{}\n", content));
+        static SKIN: Lazy<MadSkin> = Lazy::new(|| {
+            use termimad::crossterm::style::Color::*;
+            let mut skin = MadSkin::default();
+            skin.set_fg(Blue);
+            for i in 0..8 {
+                skin.headers[i].align = termimad::Alignment::Left;
+            }
+            skin
+        });
+        // Render the whole reply before writing, so the line-buffered stdout
+        // gets one write instead of a flush per rendered line.
+        let rendered = SKIN.term_text(&format!("{}\n", content)).to_string();
+        let mut stdout = io::stdout().lock();
+        stdout.write_all(rendered.as_bytes()).unwrap();
+        stdout.flush().unwrap();
     }
 
     async fn send_chat_request_and_fullfill_tool_calls(
         &mut self,
-        messages: Vec<ChatCompletionRequestMessage>,
     ) -> anyhow::Result<ChatCompletionResponseMessage> {
-        assert!(!messages.is_empty());
-        let mut response = self.send_chat_request(messages).await?;
-        self.history
-            .push(self.response_to_request_message(response.clone()));
-        if let Some(content) = response.content.as_ref() {
-            self.print_assistant_output(content);
-        }
-        'outer: while response.tool_calls.is_some() {
-            let tool_calls = response.tool_calls.as_ref().unwrap();
+        loop {
+            let response = self.send_chat_request(self.history.clone()).await?;
+            self.history
+                .push(self.response_to_request_message(response.clone()));
+            if let Some(content) = response.content.as_ref() {
+                self.print_assistant_output(content);
+            }
+            let Some(tool_calls) = response.tool_calls.as_ref() else {
+                return Ok(response);
+            };
             for tool_call in tool_calls {
                 let (tool_result, aborted) = self.execute_tool_call(tool_call);
                 self.history.push(ChatCompletionRequestMessage::Tool(
@@ -148,30 +159,20 @@ impl ShellSession {
                     },
                 ));
                 if aborted {
-                    break 'outer;
+                    return Ok(response);
                 }
             }
-            response = self.send_chat_request(self.history.clone()).await?;
-            self.history
-                .push(self.response_to_request_message(response.clone()));
-            if let Some(content) = response.content.as_ref() {
-                self.print_assistant_output(content);
-            }
         }
-        Ok(response)
     }
 
     async fn run_prompt(&mut self, prompt: &str) -> anyhow::Result<()> {
-        let mut history = self.history.clone();
-        history.push(
+        self.history.push(
             ChatCompletionRequestUserMessageArgs::default()
                 .content(prompt)
                 .build()?
                 .into(),
         );
-        let _response = self
-            .send_chat_request_and_fullfill_tool_calls(history)
-            .await?;
+        let _response = self.send_chat_request_and_fullfill_tool_calls().await?;
         Ok(())
     }
 
@@ -180,17 +181,22 @@ impl ShellSession {
             let Some(prompt) = utils::read_user_prompt()? else {
                 return Ok(());
             };
-            if prompt.trim().is_empty() {
+            let prompt = prompt.trim();
+            if prompt.is_empty() {
                 continue;
             }
-            if prompt.trim() == "exit" {
+            if matches!(prompt, "exit" | "quit") {
                 return Ok(());
             }
-            self.run_prompt(&prompt).await?;
+            self.run_prompt(prompt).await?;
         }
     }
 
     pub async fn run_single_prompt(&mut self, prompt: &str) -> anyhow::Result<()> {
+        let prompt = prompt.trim();
+        if prompt.is_empty() {
+            return Ok(());
+        }
         self.run_prompt(prompt).await?;
         Ok(())
     }
@@ -1,5 +1,5 @@
 use std::{
-    io::{self, BufRead, BufReader},
+    io::{self, BufRead, BufReader, Read},
     process::Stdio,
     sync::atomic::{AtomicBool, Ordering},
 };
@@ -83,6 +83,7 @@ pub enum ToolError {
 
 pub struct Tools {
     tools: Vec<&'static GPTFunction>,
+    info: Vec<ChatCompletionTool>,
     pub yes: AtomicBool,
     pub quiet: AtomicBool,
 }
@@ -91,16 +92,14 @@ impl Tools {
     pub fn new(tools: &[&'static GPTFunction]) -> Self {
         Self {
             tools: tools.to_vec(),
+            info: tools.iter().map(|tool| tool.get_info().unwrap()).collect(),
             yes: AtomicBool::new(false),
             quiet: AtomicBool::new(false),
         }
     }
 
     pub fn get_info(&self) -> Vec<ChatCompletionTool> {
-        self.tools
-            .iter()
-            .map(|tool| tool.get_info().unwrap())
-            .collect()
+        self.info.clone()
     }
 
     pub fn run(&self, name: &str, params: Value) -> Result<String, ToolError> {
@@ -113,6 +112,52 @@ impl Tools {
     }
 }
 
+/// Read a child process's output pipe line by line, echoing each line as it
+/// arrives and collecting the whole output into a single buffer.
+fn collect_output(pipe: impl Read, echo: fn(&str)) -> io::Result<String> {
+    let quiet = TOOLS.quiet.load(Ordering::SeqCst);
+    let mut reader = BufReader::new(pipe);
+    let mut result = "".to_owned();
+    loop {
+        let start = result.len();
+        if reader.read_line(&mut result)? == 0 {
+            return Ok(result);
+        }
+        // Like `BufRead::lines`, only drop a '\r' that is part of "\r\n"
+        let line = &result[start..];
+        let line = if let Some(l) = line.strip_suffix('\n') {
+            l.strip_suffix('\r').unwrap_or(l)
+        } else {
+            line
+        };
+        let end = start + line.len();
+        if !quiet {
+            echo(&result[start..end]);
+        }
+        result.truncate(end);
+        result.push('\n');
+    }
+}
+
+/// Maximum number of bytes of a single output stream sent back to the model.
+const MAX_OUTPUT_LEN: usize = 64 * 1024;
+
+/// Cut an output stream down to `MAX_OUTPUT_LEN` bytes before it is sent back
+/// to the model. The user still sees the full output on the terminal.
+fn truncate_output(mut output: String) -> String {
+    if output.len() <= MAX_OUTPUT_LEN {
+        return output;
+    }
+    let mut end = MAX_OUTPUT_LEN;
+    while !output.is_char_boundary(end) {
+        end -= 1;
+    }
+    let truncated = output.len() - end;
+    output.truncate(end);
+    output.push_str(&format!("\n...(truncated {} bytes)", truncated));
+    output
+}
+
 static RUN_COMMAND: Lazy<GPTFunction> = Lazy::new(|| {
     GPTFunction {
         name: "run_command",
@@ -155,31 +200,11 @@ static RUN_COMMAND: Lazy<GPTFunction> = Lazy::new(|| {
             let child_stdout = child.stdout.take().unwrap();
             let child_stderr = child.stderr.take().unwrap();
             let (status, stdout, stderr) = std::thread::scope(|s| {
-                let stdout_thread = s.spawn(|| -> io::Result<String> {
-                    let lines = BufReader::new(child_stdout).lines();
-                    let mut result = "".to_owned();
-                    for line in lines {
-                        let line = line.unwrap();
-                        if !TOOLS.quiet.load(Ordering::SeqCst) {
-                            println!("{}", line.bright_black());
-                        }
-                        result.push_str(&line);
-                        result.push('\n');
-                    }
-                    Ok(result)
+                let stdout_thread = s.spawn(|| {
+                    collect_output(child_stdout, |line| println!("{}", line.bright_black()))
                 });
-                let stderr_thread = s.spawn(|| -> io::Result<String> {
-                    let lines = BufReader::new(child_stderr).lines();
-                    let mut result = "".to_owned();
-                    for line in lines {
-                        let line = line.unwrap();
-                        if !TOOLS.quiet.load(Ordering::SeqCst) {
-                            eprintln!("{}", line.bright_black());
-                        }
-                        result.push_str(&line);
-                        result.push('\n');
-                    }
-                    Ok(result)
+                let stderr_thread = s.spawn(|| {
+                    collect_output(child_stderr, |line| eprintln!("{}", line.bright_black()))
                 });
                 let status = child.wait().unwrap();
                 let stdout = stdout_thread.join().unwrap().unwrap();
@@ -188,8 +213,8 @@ static RUN_COMMAND: Lazy<GPTFunction> = Lazy::new(|| {
             });
             let json = json!({
                 "status_code": status.code().unwrap(),
-                "stdout": stdout,
-                "stderr": stderr,
+                "stdout": truncate_output(stdout),
+                "stderr": truncate_output(stderr),
             });
             Ok(json.to_string())
         }),
@@ -13,10 +13,11 @@ use rustyline::DefaultEditor;
 use crate::utils;
 
 pub fn get_cwd_short_form() -> String {
+    static HOME_DIR: Lazy<String> =
+        Lazy::new(|| home::home_dir().unwrap().to_str().unwrap().to_owned());
     let cwd = std::env::current_dir().unwrap();
-    let home_dir = home::home_dir().unwrap();
     let cwd = cwd.to_str().unwrap();
-    let home_dir = home_dir.to_str().unwrap();
+    let home_dir = HOME_DIR.as_str();
     let simplified_home_dir = if cwd.starts_with(home_dir) {
         cwd.replacen(home_dir, "~", 1)
     } else {
@@ -24,21 +25,14 @@ pub fn get_cwd_short_form() -> String {
     };
     let simplified_home_dir = PathBuf::from(simplified_home_dir);
     let mut segments = vec![];
-    let num_segments = simplified_home_dir.components().count();
+    let mut components = simplified_home_dir.components().peekable();
 
-    for (i, c) in simplified_home_dir.components().enumerate() {
-        if i == num_segments - 1 {
-            segments.push(c.as_os_str().to_str().unwrap().to_string());
+    while let Some(c) = components.next() {
+        let c = c.as_os_str().to_str().unwrap();
+        if components.peek().is_none() {
+            segments.push(c.to_string());
         } else {
-            segments.push(
-                c.as_os_str()
-                    .to_str()
-                    .unwrap()
-                    .chars()
-                    .next()
-                    .unwrap()
-                    .to_string(),
-            );
+            segments.push(c.chars().next().unwrap().to_string());
         }
     }
 
@@ -70,10 +64,17 @@ pub fn read_user_prompt() -> anyhow::Result<Option<String>> {
 }
 
 pub fn wait_for_user_acknowledgement() -> bool {
-    let s = format!("[{}] Confirm • [{}] Abort", "ENTER↵".green(), "^c".red())
-        .white()
-        .on_bright_black();
-    print!("{}", &s);
+    // The rendered prompt label, and the sequence that erases it again
+    static LABEL: Lazy<(String, String)> = Lazy::new(|| {
+        let s = format!("[{}] Confirm • [{}] Abort", "ENTER↵".green(), "^c".red())
+            .white()
+            .on_bright_black();
+        let back = "\u{8}".repeat(s.len());
+        let erase = format!("{0}{1}{0}", back, " ".repeat(s.len()));
+        (s.to_string(), erase)
+    });
+    let (label, erase) = &*LABEL;
+    print!("{}", label);
     io::stdout().flush().unwrap();
     crossterm::terminal::enable_raw_mode().unwrap();
     let mut abort = false;
@@ -89,9 +90,7 @@ pub fn wait_for_user_acknowledgement() -> bool {
         }
     }
     crossterm::terminal::disable_raw_mode().unwrap();
-    let back = s.as_bytes().iter().map(|_| "\u{8}").collect::<String>();
-    let ws = s.as_bytes().iter().map(|_| " ").collect::<String>();
-    print!("{}{}{}", back, ws, back);
+    print!("{}", erase);
     io::stdout().flush().unwrap();
     if abort {
         println!("{}", "Aborted.".red());
@@ -101,11 +100,13 @@ pub fn wait_for_user_acknowledgement() -> bool {
 
 /// Check if the inputs are coming from a terminal
 pub fn stdin_is_terminal() -> bool {
-    io::stdin().is_terminal()
+    static IS_TERMINAL: Lazy<bool> = Lazy::new(|| io::stdin().is_terminal());
+    *IS_TERMINAL
 }
 
 pub fn stdout_is_terminal() -> bool {
-    io::stdout().is_terminal()
+    static IS_TERMINAL: Lazy<bool> = Lazy::new(|| io::stdout().is_terminal());
+    *IS_TERMINAL
 }
 
 pub fn print_banner(repl: bool) {